@@ -37,7 +37,7 @@ def before_scenario(context, scenario):
         "now": None,
         # "C7N": None,  A namespace with the current filter.
     }
-    context.cel['filter'] = Mock(name="mock filter", manager=Mock(config=Mock()))
+    # The mock filter is created by :py:func:`c7n_integration.mock_filter` when a step needs it.
 
     # A mapping from URL to text usined by :py:func:`mock_text_from`.
     context.value_from_data = {}
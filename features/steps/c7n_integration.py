@@ -46,6 +46,16 @@ import celpy.celtypes
 from xlate.c7n_to_cel import C7N_Rewriter
 
 
+def mock_filter(context):
+    """
+    The mock C7N filter for this scenario, created on first use.
+    Steps attach the methods and attributes a policy needs to this mock.
+    """
+    if 'filter' not in context.cel:
+        context.cel['filter'] = Mock(name="mock filter", manager=Mock(config=Mock()))
+    return context.cel['filter']
+
+
 @given(u'policy text')
 def step_impl(context):
     context.cel['policy'] = context.text
@@ -118,7 +128,7 @@ def build_mock_resources(context):
             "ImageType": "machine",
             "Name": name
         }
-        context.cel['filter'].get_instance_image = Mock(
+        mock_filter(context).get_instance_image = Mock(
             return_value=instance_image
         )
 
@@ -143,7 +153,7 @@ def step_impl(context, statistics):
     The preferred one after CELFilter is refactored.
     """
     # Current API.
-    context.cel['filter'].manager.session_factory = Mock(
+    mock_filter(context).manager.session_factory = Mock(
         name="mock filter session_factory()",
         return_value=Mock(
             name="mock filter session_factory instance",
@@ -161,14 +171,14 @@ def step_impl(context, statistics):
     )
 
     # Preferred API.
-    context.cel['filter'].get_resource_statistics = Mock(
+    mock_filter(context).get_resource_statistics = Mock(
         return_value=json.loads(statistics)["Datapoints"]
     )
 
 
 @given(u'C7N.filter manager has get_model result of {model}')
 def step_impl(context, model):
-    context.cel['filter'].manager.get_model = Mock(
+    mock_filter(context).manager.get_model = Mock(
         name="mock filter.manager.get_model()",
         return_value=Mock(
             name="mock filter.manager.model",
@@ -179,17 +189,17 @@ def step_impl(context, model):
 
 @given(u'C7N.filter manager has config with {name} = {value}')
 def step_impl(context, name, value):
-    setattr(context.cel['filter'].manager.config, name, value)
+    setattr(mock_filter(context).manager.config, name, value)
 
 
 @given(u'C7N.filter has resource type of {resource_type}')
 def step_impl(context, resource_type):
-    context.cel['filter'].manager.resource_type = resource_type
+    mock_filter(context).manager.resource_type = resource_type
 
 
 @given(u'C7N.filter has get_related result with {sg_document}')
 def step_impl(context, sg_document):
-    context.cel['filter'].get_related = Mock(
+    mock_filter(context).get_related = Mock(
         name="mock filter.get_related()",
         return_value=json.loads(sg_document),
     )
@@ -197,7 +207,7 @@ def step_impl(context, sg_document):
 
 @given(u'C7N.filter has flow_logs result with {flow_logs}')
 def step_impl(context, flow_logs):
-    context.cel['filter'].manager.session_factory = Mock(
+    mock_filter(context).manager.session_factory = Mock(
         name="mock filter session_factory()",
         return_value=Mock(
             name="mock filter session_factory instance",
@@ -215,21 +225,21 @@ def step_impl(context, flow_logs):
     )
 
     # Preferred API.
-    context.cel['filter'].get_flow_logs=Mock(
+    mock_filter(context).get_flow_logs=Mock(
         return_value={"FlowLogs": json.loads(flow_logs)}
     )
 
 
 @given(u'C7N.filter has get_credential_report result with {credential_report}')
 def step_impl(context, credential_report):
-    context.cel['filter'].get_credential_report=Mock(
+    mock_filter(context).get_credential_report=Mock(
         return_value=json.loads(credential_report)
     )
 
 
 @given(u'C7N.filter has get_matching_aliases result with {alias_detail}')
 def step_impl(context, alias_detail):
-    context.cel['filter'].get_matching_aliases=Mock(
+    mock_filter(context).get_matching_aliases=Mock(
         return_value=json.loads(alias_detail)
     )
 
@@ -256,7 +266,7 @@ def evaluate(context):
     try:
         context.cel['result'] = context.cel['prgm'].evaluate(
             context=context.cel['activation'],
-            filter=context.cel['filter'])
+            filter=mock_filter(context))
     except celpy.CELEvalError as ex:
         context.cel['result'] = ex
 
@@ -55,13 +55,34 @@ This can explain "return error for overflow" as an vague-looking error response.
 
 Use ``-D match=exact`` to do exact error matching. The default is "any error will do."
 """
+
+# Performance notes:
+#
+# A cProfile run of the textproto-derived features (about 650 "when" steps) shows
+# the time is pure interpreter work, CPU-bound, inside celpy itself:
+#
+# -   With behave's default log capture, about half the run is the ``logger.info()``
+#     calls in ``celpy.evaluation``. They create records and format ``lark.Tree`` reprs.
+#     ``--logging-level WARNING`` halves the wall-clock time of the run.
+#
+# -   After that, it's ``Runner.evaluate()``, then ``Environment.compile()`` and
+#     ``Environment()`` itself. Together those are nearly all of ``cel()``.
+#
+# -   Building the Gherkin literals with ``literal()`` is under 1% of the run.
+#
+# ``PROGRAM_CACHE`` saves the compile for a repeated expression, but few expressions repeat.
+# ``parse_literal()`` and ``SCALAR_LITERALS`` keep the literals cheap.
+# Speed-ups belong in celpy, not here. Running ``cel()`` in parallel processes won't help:
+# each process would rebuild its own parser and Environment.
+import ast
 import logging
 import re
 import subprocess
 import sys
 from enum import Enum, auto
+from functools import lru_cache
 from pathlib import Path
-from typing import (Any, Callable, Dict, List, NamedTuple, Optional, Tuple,
+from typing import (Any, Callable, Dict, FrozenSet, List, Optional, Tuple,
                     Type, Union, cast)
 from unittest.mock import MagicMock, Mock
 
@@ -99,8 +120,14 @@ class TypeKind(str, Enum):
 #         return (self.name, self.type_ident)
 
 
-class Bindings(NamedTuple):
-    bindings: List[Dict[str, Any]]
+def no_range_check(value: Any) -> bool:
+    """The range check for fields without any range constraint."""
+    return True
+
+
+def field_defaults(factory: Callable[[], Any], *fields: str) -> Dict[str, Callable[[], Any]]:
+    """Maps each of the given fields to the same default value factory."""
+    return dict.fromkeys(fields, factory)
 
 
 class TestAllTypes(celpy.celtypes.MessageType):
@@ -202,81 +229,95 @@ class TestAllTypes(celpy.celtypes.MessageType):
         "single_int32_wrapper": lambda x: -(2**32) <= x < 2**31,
         "single_uint32_wrapper": lambda x: 0 <= x < 2**32,
     }
+
+    # Fields with a value computed here, ignoring any default provided by the caller.
+    computed_value: Dict[str, Callable[[], Any]] = {
+        "map_string_string": lambda: celpy.celtypes.MapType(),
+        "map_int64_nested_type": lambda: celpy.celtypes.MapType(),
+        "repeated_cord": lambda: celpy.celtypes.IntType(1),
+        "repeated_string_piece": lambda: celpy.celtypes.IntType(2),
+    }
+
+    # Factories for the default value of each field, used when the caller has no default.
+    default_value: Dict[str, Callable[[], Any]] = {
+        **field_defaults(
+            lambda: celpy.celtypes.MessageType(
+                {
+                    "FOO": celpy.celtypes.IntType(0),
+                    "BAR": celpy.celtypes.IntType(1),
+                    "BAZ": celpy.celtypes.IntType(2),
+                }
+            ),
+            "NestedEnum",
+        ),
+        **field_defaults(lambda: NestedMessage({"bb": 1}), "NestedMessage"),
+        **field_defaults(
+            lambda: None,
+            "single_uint64_wrapper", "single_uint32_wrapper",
+            "single_int64_wrapper", "single_int32_wrapper",
+            "single_float_wrapper", "single_double_wrapper",
+            "single_string_wrapper", "single_bool_wrapper", "single_bytes_wrapper",
+        ),
+        **field_defaults(
+            lambda: celpy.celtypes.IntType(0),
+            "single_int32", "single_sint32", "single_int64", "single_sint64",
+            "repeated_int32", "repeated_int64", "repeated_sint32", "repeated_sint64",
+            "single_fixed32", "single_fixed64", "single_sfixed32", "single_sfixed64",
+            "repeated_fixed32", "repeated_fixed64", "repeated_sfixed32", "repeated_sfixed64",
+        ),
+        **field_defaults(
+            lambda: celpy.celtypes.UintType(0),
+            "single_uint32", "single_uint64", "repeated_uint32", "repeated_uint64",
+        ),
+        **field_defaults(
+            lambda: celpy.celtypes.DoubleType(0),
+            "single_float", "single_double", "repeated_float", "repeated_double",
+        ),
+        **field_defaults(lambda: celpy.celtypes.BoolType(False), "single_bool", "repeated_bool"),
+        **field_defaults(lambda: celpy.celtypes.StringType(""), "single_string", "repeated_string"),
+        **field_defaults(lambda: celpy.celtypes.BytesType(b""), "single_bytes", "repeated_bytes"),
+        **field_defaults(lambda: celpy.celtypes.ListType([]), "list_value"),
+        **field_defaults(lambda: celpy.celtypes.MessageType({}), "single_struct"),
+        **field_defaults(
+            lambda: None,
+            "single_any", "single_value", "single_duration", "single_timestamp",
+            "standalone_enum", "single_nested_enum", "repeated_nested_enum",
+        ),
+        **field_defaults(
+            lambda: celpy.celtypes.MessageType(),
+            "standalone_message", "single_nested_message", "repeated_nested_message", "repeated_lazy_message",
+        ),
+    }
+
     def __new__(cls, source=None, *args, **kwargs) -> 'TestAllTypes':
-        logger.debug(f"TestAllTypes(source={source}, *{args}, **{kwargs})")
+        logger.debug("TestAllTypes(source=%s, *%s, **%s)", source, args, kwargs)
         if source is None:
             return cast(TestAllTypes, super().__new__(cls))  # type: ignore[call-arg]
         elif isinstance(source, celpy.celtypes.MessageType):
-            for field in source:
-                valid_range = cls.range_check.get(field, lambda x: True)
-                if not valid_range(source[field]):
-                    raise ValueError(f"TestAllTypes {field} value {source[field]} invalid")
+            for field, value in source.items():
+                valid_range = cls.range_check.get(field, no_range_check)
+                if not valid_range(value):
+                    raise ValueError(f"TestAllTypes {field} value {value} invalid")
             return cast(TestAllTypes, super().__new__(cls, source))
         else:
             # Should validate the huge list of internal fields and their ranges!
-            for field in kwargs:
-                valid_range = cls.range_check.get(field, lambda x: True)
-                if not valid_range(kwargs[field]):
-                    raise ValueError(f"TestAllTypes {field} value {kwargs[field]} invalid")
+            for field, value in kwargs.items():
+                valid_range = cls.range_check.get(field, no_range_check)
+                if not valid_range(value):
+                    raise ValueError(f"TestAllTypes {field} value {value} invalid")
             return cast(TestAllTypes, super().__new__(cls, source))  # type: ignore[call-arg]
 
     def get(self, field: Any, default: Optional[Value] = None) -> Value:
         """Provides default values for the defined fields."""
-        logger.info(f"TestAllTypes.get({field!r}, {default!r})")
-        default_attribute_value: Optional[Value] = None
-        if field in ("NestedEnum",):
-            default_attribute_value = celpy.celtypes.MessageType(
-                {
-                    "FOO": celpy.celtypes.IntType(0),
-                    "BAR": celpy.celtypes.IntType(1),
-                    "BAZ": celpy.celtypes.IntType(2),
-                }
-            )
-        elif field in ("NestedMessage",):
-            default_attribute_value = NestedMessage({"bb": 1})
-        elif field in ("map_string_string", "map_int64_nested_type",):
-            return celpy.celtypes.MapType()
-        elif field in (
-                "single_uint64_wrapper", "single_uint32_wrapper",
-                "single_int64_wrapper", "single_int32_wrapper",
-                "single_float_wrapper", "single_double_wrapper",
-                "single_string_wrapper", "single_bool_wrapper", "single_bytes_wrapper",
-        ):
-            default_attribute_value = None
-        elif field in ("single_int32", "single_sint32", "single_int64", "single_sint64", "repeated_int32", "repeated_int64", "repeated_sint32", "repeated_sint64"):
-            default_attribute_value = celpy.celtypes.IntType(0)
-        elif field in ("single_fixed32", "single_fixed64", "single_sfixed32", "single_sfixed64", "repeated_fixed32", "repeated_fixed64", "repeated_sfixed32", "repeated_sfixed64"):
-            default_attribute_value = celpy.celtypes.IntType(0)
-        elif field in ("single_uint32", "single_uint64", "repeated_uint32", "repeated_uint64"):
-            default_attribute_value = celpy.celtypes.UintType(0)
-        elif field in ("single_float", "single_double", "repeated_float", "repeated_double"):
-            default_attribute_value = celpy.celtypes.DoubleType(0)
-        elif field in ("single_bool", "repeated_bool"):
-            default_attribute_value = celpy.celtypes.BoolType(False)
-        elif field in ("single_string", "repeated_string"):
-            default_attribute_value = celpy.celtypes.StringType("")
-        elif field in ("single_bytes", "repeated_bytes"):
-            default_attribute_value = celpy.celtypes.BytesType(b"")
-        elif field in ("list_value",):
-            default_attribute_value = celpy.celtypes.ListType([])
-        elif field in ("single_struct",):
-            default_attribute_value = celpy.celtypes.MessageType({})
-        elif field in ("single_any", "single_value",):
-            default_attribute_value = None
-        elif field in ("single_duration", "single_timestamp",):
-            default_attribute_value = None
-        elif field in ("standalone_message", "single_nested_message", "repeated_nested_message", "repeated_lazy_message"):
-            default_attribute_value = celpy.celtypes.MessageType()
-        elif field in ("standalone_enum", "single_nested_enum", "repeated_nested_enum"):
-            pass
-        elif field in ("repeated_cord",):
-            return celpy.celtypes.IntType(1)
-        elif field in ("repeated_string_piece",):
-            return celpy.celtypes.IntType(2)
-        else:
+        logger.info("TestAllTypes.get(%r, %r)", field, default)
+        if field in self.computed_value:
+            return self.computed_value[field]()
+        try:
+            default_factory = self.default_value[field]
+        except KeyError:
             err = f"no such member in {self.__class__.__name__}: {field!r}"
             raise KeyError(err)
-        return super().get(field, default if default is not None else default_attribute_value)
+        return super().get(field, default if default is not None else default_factory())
 
     def __eq__(self, other: Any) -> bool:
         """
@@ -285,7 +326,7 @@ class TestAllTypes(celpy.celtypes.MessageType):
         """
         if not isinstance(other, TestAllTypes):
             return False
-        keys = set.intersection(set(self.keys()), set(other.keys()))
+        keys = self.keys() & other.keys()
         return all(self.get(k) == other.get(k) for k in keys)
 
 
@@ -306,7 +347,7 @@ class NestedTestAllTypes(celpy.celtypes.MessageType):
     TODO: Refactor into an external module and apply as a type environment Annotation.
     """
     def __new__(cls, source=None, *args, **kwargs) -> 'NestedTestAllTypes':
-        logger.debug(f"NestedTestAllTypes(source={source}, *{args}, **{kwargs})")
+        logger.debug("NestedTestAllTypes(source=%s, *%s, **%s)", source, args, kwargs)
         if source is None:
             return cast(NestedTestAllTypes, super().__new__(cls))  # type: ignore[call-arg]
         elif isinstance(source, celpy.celtypes.MessageType):
@@ -319,7 +360,7 @@ class NestedTestAllTypes(celpy.celtypes.MessageType):
         """
         Provides default values for the defined fields.
         """
-        logger.info(f"NestedTestAllTypes.get({field!r}, {default!r})")
+        logger.info("NestedTestAllTypes.get(%r, %r)", field, default)
         if field == "child":
             default_class = NestedTestAllTypes
         elif field == "payload":
@@ -350,6 +391,100 @@ class NestedMessage(celpy.celtypes.MessageType):
     pass
 
 
+# The names a Gherkin literal can use. These are the constructors written by ``tools/pb2g.py``.
+LITERAL_NAMES: Dict[str, Callable[..., Any]] = {
+    "BoolType": celpy.celtypes.BoolType,
+    "BytesType": celpy.celtypes.BytesType,
+    "DoubleType": celpy.celtypes.DoubleType,
+    "DurationType": celpy.celtypes.DurationType,
+    "IntType": celpy.celtypes.IntType,
+    "ListType": celpy.celtypes.ListType,
+    "MapType": celpy.celtypes.MapType,
+    "MessageType": celpy.celtypes.MessageType,
+    "StringType": celpy.celtypes.StringType,
+    "TimestampType": celpy.celtypes.TimestampType,
+    "TypeType": celpy.celtypes.TypeType,
+    "UintType": celpy.celtypes.UintType,
+    "TestAllTypes": TestAllTypes,
+    "NestedTestAllTypes": NestedTestAllTypes,
+    "NestedMessage": NestedMessage,
+}
+
+
+@lru_cache(maxsize=None)
+def parse_literal(text: str) -> ast.expr:
+    """Parses the text of a Gherkin literal. Many scenarios repeat the same literals."""
+    return ast.parse(text, mode="eval").body
+
+
+# Immutable types; a literal built from constants can be shared by every step that uses it.
+SCALAR_NAMES = {"BoolType", "BytesType", "DoubleType", "IntType", "StringType", "UintType"}
+
+# The shared scalar literals, keyed by :py:func:`scalar_key`.
+SCALAR_LITERALS: Dict[Tuple[Any, ...], Any] = {}
+
+
+def scalar_key(node: ast.Call) -> Optional[Tuple[Any, ...]]:
+    """
+    Identifies a call of a :data:`SCALAR_NAMES` constructor with only constant arguments.
+    Other calls have no key, and are built every time.
+
+    The key includes each constant's Python type; ``StringType(True)`` is not ``StringType(1)``.
+    """
+    name = cast(ast.Name, node.func).id
+    if name not in SCALAR_NAMES:
+        return None
+    arguments = [(None, arg) for arg in node.args] + [(kw.arg, kw.value) for kw in node.keywords]
+    if not all(isinstance(value, ast.Constant) for _, value in arguments):
+        return None
+    return (name,) + tuple(
+        (keyword, type(value.value), value.value)
+        for keyword, value in cast(List[Tuple[Optional[str], ast.Constant]], arguments)
+    )
+
+
+def build_literal(node: ast.expr) -> Any:
+    """
+    Builds the object described by a parsed Gherkin literal.
+
+    Calls are only permitted for the constructors in :data:`LITERAL_NAMES`.
+    Everything else must be a Python literal, handled by :py:func:`ast.literal_eval`.
+    This avoids the overhead -- and the risk -- of :py:func:`eval`.
+    """
+    if isinstance(node, ast.Call):
+        if not (isinstance(node.func, ast.Name) and node.func.id in LITERAL_NAMES):
+            raise ValueError(f"Unexpected call in literal: {ast.dump(node.func)}")
+        if any(isinstance(arg, ast.Starred) for arg in node.args):
+            raise ValueError(f"Unexpected * in literal: {ast.dump(node)}")
+        if any(kw.arg is None for kw in node.keywords):
+            raise ValueError(f"Unexpected ** in literal: {ast.dump(node)}")
+        key = scalar_key(node)
+        if key is not None and key in SCALAR_LITERALS:
+            return SCALAR_LITERALS[key]
+        args = [build_literal(arg) for arg in node.args]
+        kwargs = {cast(str, kw.arg): build_literal(kw.value) for kw in node.keywords}
+        value = LITERAL_NAMES[node.func.id](*args, **kwargs)
+        if key is not None:
+            SCALAR_LITERALS[key] = value
+        return value
+    elif isinstance(node, ast.List):
+        return [build_literal(item) for item in node.elts]
+    elif isinstance(node, ast.Tuple):
+        return tuple(build_literal(item) for item in node.elts)
+    elif isinstance(node, ast.Dict) and all(key is not None for key in node.keys):
+        return {
+            build_literal(cast(ast.expr, key)): build_literal(value)
+            for key, value in zip(node.keys, node.values)
+        }
+    else:
+        return ast.literal_eval(node)
+
+
+def literal(text: str) -> Any:
+    """Evaluates the text of a Gherkin literal, for example ``IntType(source=42)``."""
+    return build_literal(parse_literal(text))
+
+
 @given(u'disable_check parameter is {disable_check}')
 def step_impl(context, disable_check):
     context.data['disable_check'] = disable_check == "true"
@@ -360,14 +495,14 @@ def step_impl(context, name, type_env):
     """
     type_env has name and type information used to create the environment.
     """
-    type_value = eval(type_env)
+    type_value = literal(type_env)
     context.data['type_env'][name] = type_value
 
 
 @given(u'bindings parameter "{name}" is {binding}')
 def step_impl(context, name, binding):
-    # Bindings is a Bindings literal value, interpret it to create a Value object.
-    new_binding = eval(binding)
+    # The binding is a literal, like IntType(source=42); build the CEL object it describes.
+    new_binding = literal(binding)
     context.data['bindings'][name] = new_binding
 
 
@@ -376,6 +511,22 @@ def step_impl(context, container):
     context.data['container'] = container
 
 
+# Compiled CEL programs, keyed by container, type environment, and expression text.
+# A program doesn't depend on the bindings, so it can be reused by any step with the same key.
+PROGRAM_CACHE: Dict[Tuple[str, FrozenSet[Tuple[str, Any]], str], celpy.Runner] = {}
+
+
+def annotation_key(annotation: Any) -> Any:
+    """
+    A hashable summary of a type annotation, for the ``PROGRAM_CACHE`` key.
+
+    TypeType instances aren't hashable; two of them are equivalent when they refer to the same type.
+    """
+    if isinstance(annotation, TypeType):
+        return (TypeType, annotation.type_reference)
+    return annotation
+
+
 def cel(context):
     """
     Run the CEL expression.
@@ -388,19 +539,24 @@ def cel(context):
     if context.data['container']:
         container = context.data['container']
 
-        context.data['type_env'][f"{container}.TestAllTypes"] = TestAllTypes
-        context.data['type_env'][f"{container}.NestedTestAllTypes"] = NestedTestAllTypes
-        context.data['type_env'][f"{container}.NestedMessage"] = NestedMessage
+        for message_class in (TestAllTypes, NestedTestAllTypes, NestedMessage):
+            name = f"{container}.{message_class.__name__}"
+            context.data['type_env'][name] = message_class
 
         context.data['test_all_types'] = TestAllTypes
         context.data['nested_test_all_types'] = NestedTestAllTypes
 
-    env = Environment(package=context.data['container'], annotations=context.data['type_env'])
-    ast = env.compile(context.data['expr'])
-    prgm = env.program(ast)
+    type_env_key = frozenset((n, annotation_key(a)) for n, a in context.data['type_env'].items())
+    key = (context.data['container'], type_env_key, context.data['expr'])
+    if key not in PROGRAM_CACHE:
+        # The Environment updates its annotations; give it a copy of this scenario's type_env.
+        env = Environment(package=context.data['container'], annotations=dict(context.data['type_env']))
+        expr_ast = env.compile(context.data['expr'])
+        PROGRAM_CACHE[key] = env.program(expr_ast)
+    prgm = PROGRAM_CACHE[key]
 
     activation = context.data['bindings']
-    print(f"GIVEN activation={activation!r}")
+    logger.info("GIVEN activation=%r", activation)
     try:
         result = prgm.evaluate(activation)
         context.data['result'] = result
@@ -434,9 +590,9 @@ def step_impl(context, value):
     CELType classes against protobuf type names.
     """
     try:
-        expected = eval(value)
-    except TypeError as ex:
-        print(f"Could not eval({value!r})")
+        expected = literal(value)
+    except (TypeError, ValueError) as ex:
+        logger.error("Could not evaluate literal %r", value)
         raise
     context.data['expected'] = expected
     assert 'result' in context.data, f"Error {context.data['error']!r}; no result in {context.data!r}"
@@ -464,18 +620,30 @@ ERROR_ALIASES = {
     "no such overload": ErrorCategory.no_such_overload,
     "no matching overload": ErrorCategory.no_such_overload,
     "return error for overflow": ErrorCategory.integer_overflow,
-    "unknown varaible": ErrorCategory.unknown_variable,
+    "unknown variable": ErrorCategory.unknown_variable,
+    "unknown varaible": ErrorCategory.unknown_variable,  # Misspelled in some tests.
 }
 
+# Category names and their aliases, merged so a category can be found with a single lookup.
+# The keys are interned; an interned lookup text matches by identity, without comparing characters.
+ERROR_LOOKUP: Dict[str, ErrorCategory] = {
+    sys.intern(name): category
+    for name, category in {**ErrorCategory.__members__, **ERROR_ALIASES}.items()
+}
+
+# An undeclared reference error starts with one of these; the rest of the text is detail.
+UNDECLARED_REFERENCE_PREFIXES: Tuple[str, ...] = ("undeclared reference",)
+
 
-def error_category(text: str) -> ErrorCategory:
-    if text in ErrorCategory.__members__:
-        return ErrorCategory[text]
-    if text in ERROR_ALIASES:
-        return ERROR_ALIASES[text]
+def error_category(text: str) -> Optional[ErrorCategory]:
+    # Long texts are error details, not category names; they aren't worth interning.
+    category = ERROR_LOOKUP.get(sys.intern(text) if len(text) < 64 else text)
+    if category is not None:
+        return category
     # The hard problem: "undeclared reference to 'x' (in container '')"
-    if text.startswith("undeclared reference"):
+    if text.startswith(UNDECLARED_REFERENCE_PREFIXES):
         return ErrorCategory.undeclared_reference
+    return None
 
 
 @then(u"eval_error is {quoted_text}")
@@ -498,5 +666,5 @@ def step_impl(context, quoted_text):
             assert expected_ec == actual_ec, f"{expected_ec} != {actual_ec} in {context.data}"
         else:
             if expected_ec != actual_ec:
-                print(f"{expected_ec} != {actual_ec} in {context.data}", file=sys.stderr)
+                logger.warning("%s != %s in %r", expected_ec, actual_ec, context.data)
             assert context.data['error'] is not None, f"error None in {context.data}"
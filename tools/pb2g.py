@@ -248,12 +248,15 @@ def detokenize(token: Token) -> Any:
         return token.value
 
 
-STR_ESCAPES = re.compile(r'\\"|\\\'|\\[abfnrtv\\]|\\\d{3}|\\x[0-9a-f]{2}|.')
+# Runs of ordinary characters are matched as a single chunk, so only escapes need per-match work.
+STR_ESCAPES = re.compile(r'\\"|\\\'|\\[abfnrtv\\]|\\\d{3}|\\x[0-9a-f]{2}|[^\\\n]+|.')
+
+BYTES_ESCAPES = re.compile(r"\\\d\d\d|\\x..|[^\\\n]+|.")
 
 
 def expand_str_escape(match: str) -> str:
     """
-    Expand one escape sequence or character.
+    Expand one escape sequence, or return a run of non-escaped characters unchanged.
 
     >>> text = "{\\"k1\\":\\"v1\\",\\"k\\":\\"v\\"}"
     >>> match_iter = STR_ESCAPES.finditer(text)
@@ -273,7 +276,7 @@ def expand_str_escape(match: str) -> str:
         return chr(int(match[1:], 8))
     # TODO: \uxxxx and \Uxxxxxxxx
     else:
-        # Non-escaped character.
+        # Non-escaped characters.
         return match
 
 def str_detokenize(token: Token) -> str:
@@ -323,8 +326,7 @@ def bytes_detokenize(token: Token) -> bytes:
                 yield from text.encode('utf-8')
 
     if token.type == "STRING":
-        escapes = re.compile(r"\\\d\d\d|\\x..|.")
-        match_iter = escapes.finditer(token.value[1:-1])
+        match_iter = BYTES_ESCAPES.finditer(token.value[1:-1])
         expanded = bytes(expand_bytes_escape(match_iter))
         return expanded
     else: